@@ -17,6 +17,8 @@ from __future__ import annotations
 
 import os
 import queue
+import re
+import shutil
 import signal
 import subprocess
 import sys
@@ -31,15 +33,45 @@ from tkinter import ttk
 
 
 ADB_EXE = "adb"
+ADB_DEVICES_TIMEOUT = 5
 DEFAULT_PREFIX = "bt"
 DEFAULT_RETENTION = 36
 DEFAULT_BUGREPORT_COOLDOWN = 900
 DEFAULT_BUGREPORT_DIR = "bugreports"
 COMPACT_WIDTH_BREAKPOINT = 720
+RESIZE_DEBOUNCE_MS = 50
+LAYOUT_COLUMN_WEIGHTS = (0, 1, 0, 0)
+READ_CHUNK_SIZE = 65536
+DRAIN_MAX_CHARS = 256 * 1024
+DRAIN_MAX_LINES = 2000
+MAX_LOG_LINES = 20000
+FALLBACK_POLL_MS = 120
+POLL_BURST_MS = 30
+POLL_BURST_LINES = 100
+POLL_IDLE_MS = 500
+POLL_IDLE_TICKS = 10
+OUTPUT_QUEUE_MAXSIZE = 512  # chunks of up to READ_CHUNK_SIZE bytes
+TRIM_CHECK_LINES = 1000  # inserted lines between trims; caps overshoot past MAX_LOG_LINES
+
+# `adb devices -l` row: serial, state, then optional key:value extras.
+# Matched per line over the whole output, so separators must not span newlines.
+_DEVICE_LINE_RE = re.compile(r"^[ \t]*(\S+)(?:[ \t]+(\S+))?(?:[ \t]+(.*?))?[ \t]*$", re.M)
+_DEVICE_KV_RE = re.compile(r"\b(model|device|product):(\S+)")
+_KW_SPLIT_RE = re.compile(r"[;,\n]+")
+
+# Collector script shipped next to this file; resolved once at import
+_SCRIPT_PATH = Path(__file__).parent / "logcat_rotate.py"
+_SCRIPT_EXISTS = _SCRIPT_PATH.exists()
+
+# On Windows, avoid opening console window when packaged
+_CREATION_FLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
 
 
 @dataclass
 class Device:
+    # Explicit slots (dataclass(slots=True) needs Python 3.10+)
+    __slots__ = ("serial", "label", "state")
+
     serial: str
     label: str  # Human friendly label, e.g., "emulator-5554 • Pixel 7 (device)"
     state: str  # device | offline | unauthorized | unknown
@@ -47,80 +79,114 @@ class Device:
 
 def which(program: str) -> Optional[str]:
     """Return absolute path if program exists in PATH, else None."""
-    paths = os.environ.get("PATH", "").split(os.pathsep)
-    exts = [""]
-    if os.name == "nt":
-        # Typical executable extensions on Windows
-        pathext = os.environ.get("PATHEXT", ".EXE;.BAT;.CMD")
-        exts = pathext.lower().split(";")
-    for p in paths:
-        candidate = Path(p) / program
-        if candidate.is_file() and os.access(candidate, os.X_OK):
-            return str(candidate)
-        if os.name == "nt":
-            for ext in exts:
-                candidate_ext = Path(p) / f"{program}{ext}"
-                if candidate_ext.is_file() and os.access(candidate_ext, os.X_OK):
-                    return str(candidate_ext)
-    return None
+    # shutil.which already handles PATHEXT on Windows and X_OK checks
+    return shutil.which(program)
+
+
+_ADB_PATH_CACHE: Optional[str] = None
+
+
+def _cached_which_adb() -> Optional[str]:
+    """Return the adb path, walking PATH only until it is first found."""
+    global _ADB_PATH_CACHE
+    if _ADB_PATH_CACHE is None:
+        _ADB_PATH_CACHE = which(ADB_EXE)
+    return _ADB_PATH_CACHE
 
 
 def list_adb_devices() -> List[Device]:
     """Return a list of connected ADB devices with state and friendly labels."""
     try:
+        # stderr stays separate so "* daemon not running; starting now" notes
+        # cannot displace the header line skipped below.
         proc = subprocess.run(
             [ADB_EXE, "devices", "-l"],
             check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
+            capture_output=True,
             text=True,
+            timeout=ADB_DEVICES_TIMEOUT,
         )
     except FileNotFoundError:
         return []
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
         # Return empty list on failure; caller can show error
         return []
 
-    lines = proc.stdout.splitlines()
+    out = proc.stdout
+    # Skip header "List of devices attached"
+    header_end = out.find("\n")
+    if header_end < 0:
+        return []
     devices: List[Device] = []
-    for line in lines[1:]:  # Skip header "List of devices attached"
-        line = line.strip()
-        if not line:
-            continue
-        # Expected formats:
-        #   emulator-5554	device product:sdk_gphone_x86 model:Android_SDK_built_for_x86 ...
-        #   R3CN30...	unauthorized
-        parts = line.split()
-        if not parts:
-            continue
-        serial = parts[0]
-        state = parts[1] if len(parts) > 1 else "unknown"
-        extras = " ".join(parts[2:]) if len(parts) > 2 else ""
-        label = serial
-        if extras:
-            # Try to surface model or device from extras if available
-            model = _extract_kv(extras, "model:")
-            device_raw = _extract_kv(extras, "device:")
-            product = _extract_kv(extras, "product:")
-            pretty_bits = [b for b in [model, device_raw, product] if b]
-            if pretty_bits:
-                label = f"{serial} • {' / '.join(pretty_bits)} ({state})"
-            else:
-                label = f"{serial} ({state})"
+    # Expected formats:
+    #   emulator-5554	device product:sdk_gphone_x86 model:Android_SDK_built_for_x86 ...
+    #   R3CN30...	unauthorized
+    for m in _DEVICE_LINE_RE.finditer(out, header_end + 1):
+        serial, state, extras = m.groups()
+        state = state or "unknown"
+        # Try to surface model or device from extras if available
+        kv = dict(_DEVICE_KV_RE.findall(extras or ""))
+        pretty_bits = [kv[k] for k in ("model", "device", "product") if kv.get(k)]
+        if pretty_bits:
+            label = f"{serial} • {' / '.join(pretty_bits)} ({state})"
         else:
             label = f"{serial} ({state})"
         devices.append(Device(serial=serial, label=label, state=state))
     return devices
 
 
-def _extract_kv(blob: str, key: str) -> Optional[str]:
-    for token in blob.split():
-        if token.startswith(key):
-            return token[len(key) :]
-    return None
+def _decode_output(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace").replace("\r\n", "\n")
+
+
+def _cell(row: int, column: int, sticky: str, columnspan: int = 1) -> dict[str, Any]:
+    # grid() keeps options from a previous call, so columnspan is always
+    # spelled out for both layout modes.
+    return {"row": row, "column": column, "sticky": sticky, "columnspan": columnspan}
+
+
+# kind -> (widget class, option name that takes the bound variable)
+_WIDGET_KINDS: dict[str, tuple[Any, Optional[str]]] = {
+    "label": (ttk.Label, None),
+    "entry": (ttk.Entry, "textvariable"),
+    "combo": (ttk.Combobox, "textvariable"),
+    "button": (ttk.Button, None),
+    "check": (ttk.Checkbutton, "variable"),
+}
 
 
 class LogCollectorUI(tk.Tk):
+    # Settings form, in creation (and Tab focus) order:
+    # (attribute, kind, text, variable attribute, extra options,
+    #  wide-layout cell, compact-layout cell). A "command" option names a method.
+    _TOP_WIDGETS: tuple[tuple[str, str, str, Optional[str], dict[str, Any], dict[str, Any], dict[str, Any]], ...] = (
+        # ADB path status
+        ("lbl_adb", "label", "ADB:", None, {}, _cell(0, 0, tk.W), _cell(0, 0, tk.W)),
+        ("adb_path_lbl", "label", "檢查中…", None, {}, _cell(0, 1, tk.W, 3), _cell(0, 1, tk.W)),
+        # Device selection
+        ("lbl_device", "label", "裝置:", None, {}, _cell(1, 0, tk.W), _cell(1, 0, tk.W)),
+        ("device_combo", "combo", "", "selected_device", {"state": "readonly"}, _cell(1, 1, tk.EW), _cell(1, 1, tk.EW)),
+        ("btn_refresh", "button", "重新整理", None, {"command": "refresh_devices"}, _cell(1, 2, tk.W), _cell(2, 1, tk.E)),
+        # Output directory
+        ("lbl_dir", "label", "輸出資料夾:", None, {}, _cell(2, 0, tk.W), _cell(3, 0, tk.W)),
+        ("dir_entry", "entry", "", "output_dir", {}, _cell(2, 1, tk.EW), _cell(3, 1, tk.EW)),
+        ("btn_browse_dir", "button", "瀏覽…", None, {"command": "browse_dir"}, _cell(2, 2, tk.W), _cell(4, 1, tk.E)),
+        # Prefix & retention
+        ("lbl_prefix", "label", "前綴:", None, {}, _cell(3, 0, tk.W), _cell(5, 0, tk.W)),
+        ("prefix_entry", "entry", "", "prefix", {"width": 12}, _cell(3, 1, tk.W), _cell(5, 1, tk.EW)),
+        ("lbl_retention", "label", "保留(小時):", None, {}, _cell(3, 2, tk.W), _cell(6, 0, tk.W)),
+        ("retention_entry", "entry", "", "retention", {"width": 6}, _cell(3, 3, tk.W), _cell(6, 1, tk.W)),
+        # Bugreport settings
+        ("bugreport_check", "check", "啟用 bugreport", "bugreport_enabled", {}, _cell(4, 0, tk.W, 2), _cell(7, 0, tk.W, 2)),
+        ("lbl_cooldown", "label", "冷卻(秒):", None, {}, _cell(4, 2, tk.W), _cell(8, 0, tk.W)),
+        ("cooldown_entry", "entry", "", "bugreport_cooldown", {"width": 8}, _cell(4, 3, tk.W), _cell(8, 1, tk.W)),
+        ("lbl_keywords", "label", "關鍵字(逗號分隔):", None, {}, _cell(5, 0, tk.W), _cell(9, 0, tk.W)),
+        ("keywords_entry", "entry", "", "bugreport_keywords", {}, _cell(5, 1, tk.EW, 2), _cell(9, 1, tk.EW)),
+        ("lbl_bugdir", "label", "Bugreport 目錄:", None, {}, _cell(6, 0, tk.W), _cell(10, 0, tk.W)),
+        ("bugdir_entry", "entry", "", "bugreport_dir", {}, _cell(6, 1, tk.EW), _cell(10, 1, tk.EW)),
+        ("btn_browse_bugdir", "button", "瀏覽…", None, {"command": "browse_bug_dir"}, _cell(6, 2, tk.W), _cell(11, 1, tk.E)),
+    )
+
     def __init__(self) -> None:
         super().__init__()
         self.title("Android Log Collector UI")
@@ -130,12 +196,28 @@ class LogCollectorUI(tk.Tk):
 
         # State
         self.devices: List[Device] = []
+        self._label_index: dict[str, Device] = {}
+        self._adb_path: Optional[str] = None
+        # Environment snapshot for the collector; assumed stable per session
+        # the reader decodes UTF-8, so the child must not write the locale codepage (cp950 on zh-TW)
+        self._base_env = {**os.environ, "PYTHONIOENCODING": "utf-8:replace"}
         self.proc: Optional[subprocess.Popen] = None
         self.reader_thread: Optional[threading.Thread] = None
-        self.output_queue: "queue.Queue[str]" = queue.Queue()
+        self.output_queue: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+        self._dropped_chunks = 0
+        self._dropped_lock = threading.Lock()
         self._stop_reader = threading.Event()
+        self._refresh_in_flight = False
+        # device list handed from the refresh worker on non-threaded Tcl
+        self._pending_devices: Optional[List[Device]] = None
+        self._lines_since_trim = 0
+        self._wake_pending = threading.Event()
+        self._idle_polls = 0
         self._layout_items: list[tuple[tk.Widget, dict[str, Any], dict[str, Any]]] = []
         self._current_layout_compact: Optional[bool] = None
+        self._resize_after_id: Optional[str] = None
+        self._last_width = 0
+        self._last_wraplength = 0
 
         # UI variables
         self.selected_device = tk.StringVar()
@@ -154,11 +236,18 @@ class LogCollectorUI(tk.Tk):
 
         # Initial load
         self._refresh_adb_path_status()
-        self.refresh_devices()
+        # Let the window paint before spawning adb
+        self.after_idle(self.refresh_devices)
         self._append_log("UI 啟動完成。請選擇裝置與輸出資料夾後開始。\n")
 
-        # Periodic polling for output
-        self.after(120, self._drain_output_queue)
+        # The reader thread wakes the UI through a virtual event when output
+        # arrives, so there is no idle polling. Tcl builds without thread
+        # support cannot take calls from other threads; poll there instead.
+        self._threaded_tcl = bool(self.tk.call("info", "exists", "tcl_platform(threaded)"))
+        if self._threaded_tcl:
+            self.bind("<<LogData>>", lambda _e: self._drain_output_queue())
+        else:
+            self.after(FALLBACK_POLL_MS, self._poll_output_queue)
 
     # UI construction
     def _build_widgets(self) -> None:
@@ -166,166 +255,28 @@ class LogCollectorUI(tk.Tk):
         self.frame_top = ttk.Frame(self)
         self.frame_top.pack(fill=tk.X, expand=False, **pad)
 
-        def register(widget: tk.Widget, wide_opts: dict[str, Any], compact_opts: dict[str, Any]) -> None:
-            base_pad = {"padx": 4, "pady": 3}
-            wide = {**base_pad, **wide_opts}
-            compact = {**base_pad, **compact_opts}
-            self._layout_items.append((widget, wide, compact))
-
-        # ADB path status
-        self.lbl_adb = ttk.Label(self.frame_top, text="ADB:")
-        register(
-            self.lbl_adb,
-            {"row": 0, "column": 0, "sticky": tk.W},
-            {"row": 0, "column": 0, "sticky": tk.W},
-        )
-
-        self.adb_path_lbl = ttk.Label(self.frame_top, text="檢查中…")
-        register(
-            self.adb_path_lbl,
-            {"row": 0, "column": 1, "columnspan": 3, "sticky": tk.W},
-            {"row": 0, "column": 1, "sticky": tk.W},
-        )
-
-        # Device selection
-        self.lbl_device = ttk.Label(self.frame_top, text="裝置:")
-        register(
-            self.lbl_device,
-            {"row": 1, "column": 0, "sticky": tk.W},
-            {"row": 1, "column": 0, "sticky": tk.W},
-        )
-
-        self.device_combo = ttk.Combobox(
-            self.frame_top, textvariable=self.selected_device, state="readonly"
-        )
-        register(
-            self.device_combo,
-            {"row": 1, "column": 1, "sticky": tk.EW},
-            {"row": 1, "column": 1, "sticky": tk.EW},
-        )
-
-        self.btn_refresh = ttk.Button(self.frame_top, text="重新整理", command=self.refresh_devices)
-        register(
-            self.btn_refresh,
-            {"row": 1, "column": 2, "sticky": tk.W},
-            {"row": 2, "column": 1, "sticky": tk.E},
-        )
-
-        # Output directory
-        self.lbl_dir = ttk.Label(self.frame_top, text="輸出資料夾:")
-        register(
-            self.lbl_dir,
-            {"row": 2, "column": 0, "sticky": tk.W},
-            {"row": 3, "column": 0, "sticky": tk.W},
-        )
-
-        self.dir_entry = ttk.Entry(self.frame_top, textvariable=self.output_dir)
-        register(
-            self.dir_entry,
-            {"row": 2, "column": 1, "sticky": tk.EW},
-            {"row": 3, "column": 1, "sticky": tk.EW},
-        )
-
-        self.btn_browse_dir = ttk.Button(self.frame_top, text="瀏覽…", command=self.browse_dir)
-        register(
-            self.btn_browse_dir,
-            {"row": 2, "column": 2, "sticky": tk.W},
-            {"row": 4, "column": 1, "sticky": tk.E},
-        )
-
-        # Prefix & retention
-        self.lbl_prefix = ttk.Label(self.frame_top, text="前綴:")
-        register(
-            self.lbl_prefix,
-            {"row": 3, "column": 0, "sticky": tk.W},
-            {"row": 5, "column": 0, "sticky": tk.W},
-        )
-
-        self.prefix_entry = ttk.Entry(self.frame_top, textvariable=self.prefix, width=12)
-        register(
-            self.prefix_entry,
-            {"row": 3, "column": 1, "sticky": tk.W},
-            {"row": 5, "column": 1, "sticky": tk.EW},
-        )
-
-        self.lbl_retention = ttk.Label(self.frame_top, text="保留(小時):")
-        register(
-            self.lbl_retention,
-            {"row": 3, "column": 2, "sticky": tk.W},
-            {"row": 6, "column": 0, "sticky": tk.W},
-        )
-
-        self.retention_entry = ttk.Entry(self.frame_top, textvariable=self.retention, width=6)
-        register(
-            self.retention_entry,
-            {"row": 3, "column": 3, "sticky": tk.W},
-            {"row": 6, "column": 1, "sticky": tk.W},
-        )
-
-        # Bugreport settings
-        self.bugreport_check = ttk.Checkbutton(
-            self.frame_top, text="啟用 bugreport", variable=self.bugreport_enabled
-        )
-        register(
-            self.bugreport_check,
-            {"row": 4, "column": 0, "columnspan": 2, "sticky": tk.W},
-            {"row": 7, "column": 0, "columnspan": 2, "sticky": tk.W},
-        )
-
-        self.lbl_cooldown = ttk.Label(self.frame_top, text="冷卻(秒):")
-        register(
-            self.lbl_cooldown,
-            {"row": 4, "column": 2, "sticky": tk.W},
-            {"row": 8, "column": 0, "sticky": tk.W},
-        )
-
-        self.cooldown_entry = ttk.Entry(
-            self.frame_top, textvariable=self.bugreport_cooldown, width=8
-        )
-        register(
-            self.cooldown_entry,
-            {"row": 4, "column": 3, "sticky": tk.W},
-            {"row": 8, "column": 1, "sticky": tk.W},
-        )
-
-        self.lbl_keywords = ttk.Label(self.frame_top, text="關鍵字(逗號分隔):")
-        register(
-            self.lbl_keywords,
-            {"row": 5, "column": 0, "sticky": tk.W},
-            {"row": 9, "column": 0, "sticky": tk.W},
-        )
-
-        self.keywords_entry = ttk.Entry(
-            self.frame_top, textvariable=self.bugreport_keywords
-        )
-        register(
-            self.keywords_entry,
-            {"row": 5, "column": 1, "columnspan": 2, "sticky": tk.EW},
-            {"row": 9, "column": 1, "sticky": tk.EW},
-        )
-
-        self.lbl_bugdir = ttk.Label(self.frame_top, text="Bugreport 目錄:")
-        register(
-            self.lbl_bugdir,
-            {"row": 6, "column": 0, "sticky": tk.W},
-            {"row": 10, "column": 0, "sticky": tk.W},
-        )
-
-        self.bugdir_entry = ttk.Entry(self.frame_top, textvariable=self.bugreport_dir)
-        register(
-            self.bugdir_entry,
-            {"row": 6, "column": 1, "sticky": tk.EW},
-            {"row": 10, "column": 1, "sticky": tk.EW},
-        )
-
-        self.btn_browse_bugdir = ttk.Button(
-            self.frame_top, text="瀏覽…", command=self.browse_bug_dir
-        )
-        register(
-            self.btn_browse_bugdir,
-            {"row": 6, "column": 2, "sticky": tk.W},
-            {"row": 11, "column": 1, "sticky": tk.E},
-        )
+        base = {"padx": 4, "pady": 3}
+        for attr, kind, text, var, opts, wide_opts, compact_opts in self._TOP_WIDGETS:
+            factory, var_option = _WIDGET_KINDS[kind]
+            kwargs = dict(opts)
+            if text:
+                kwargs["text"] = text
+            if var:
+                kwargs[var_option] = getattr(self, var)
+            if "command" in kwargs:
+                kwargs["command"] = getattr(self, kwargs["command"])
+            widget = factory(self.frame_top, **kwargs)
+            setattr(self, attr, widget)
+            self._layout_items.append((widget, {**base, **wide_opts}, {**base, **compact_opts}))
+
+        # After the first layout pass only widgets that actually move between
+        # modes need to be re-gridded.
+        moving = [(w, wide, compact) for w, wide, compact in self._layout_items if wide != compact]
+        self._wide_params = [(w, wide) for w, wide, _ in moving]
+        self._compact_params = [(w, compact) for w, _, compact in moving]
+        # Both layouts stretch only the input column
+        for idx, weight in enumerate(LAYOUT_COLUMN_WEIGHTS):
+            self.frame_top.columnconfigure(idx, weight=weight)
 
         # Start/Stop buttons
         self.frame_btn = ttk.Frame(self)
@@ -348,7 +299,10 @@ class LogCollectorUI(tk.Tk):
         self.frame_log.columnconfigure(0, weight=1)
         self.frame_log.rowconfigure(0, weight=1)
 
-        self.text = tk.Text(self.frame_log, height=20, wrap=tk.NONE)
+        # Read-only log view: no undo history per insert
+        self.text = tk.Text(
+            self.frame_log, height=20, wrap=tk.NONE, undo=False, maxundo=0, autoseparators=False
+        )
         self.text.grid(row=0, column=0, sticky=tk.NSEW)
 
         yscroll = ttk.Scrollbar(self.frame_log, orient=tk.VERTICAL, command=self.text.yview)
@@ -361,40 +315,50 @@ class LogCollectorUI(tk.Tk):
         if self._current_layout_compact is not None and compact == self._current_layout_compact:
             return
 
+        if self._current_layout_compact is None:
+            # First pass: place every widget
+            params = [
+                (w, compact_opts if compact else wide_opts)
+                for w, wide_opts, compact_opts in self._layout_items
+            ]
+        else:
+            params = self._compact_params if compact else self._wide_params
         self._current_layout_compact = compact
 
-        for widget, _, _ in self._layout_items:
-            widget.grid_forget()
-
-        # reset column weights
-        for idx in range(4):
-            self.frame_top.columnconfigure(idx, weight=0)
+        # Re-gridding moves widgets in place; no grid_forget pass needed
+        for widget, opts in params:
+            widget.grid(**opts)
 
-        if compact:
-            for widget, _, compact_opts in self._layout_items:
-                widget.grid(**compact_opts)
-            self.frame_top.columnconfigure(0, weight=0)
-            self.frame_top.columnconfigure(1, weight=1)
-            wrap = max(self.winfo_width() - 160, 260)
+        wrap = max(self.winfo_width() - 160, 260) if compact else 0
+        if wrap != self._last_wraplength:
+            self._last_wraplength = wrap
             self.adb_path_lbl.configure(wraplength=wrap)
-        else:
-            for widget, wide_opts, _ in self._layout_items:
-                widget.grid(**wide_opts)
-            self.frame_top.columnconfigure(0, weight=0)
-            self.frame_top.columnconfigure(1, weight=1)
-            self.frame_top.columnconfigure(2, weight=0)
-            self.frame_top.columnconfigure(3, weight=0)
-            self.adb_path_lbl.configure(wraplength=0)
 
         self.frame_top.update_idletasks()
 
     def _on_window_resize(self, event: tk.Event[Any]) -> None:
-        if event.widget is not self:
+        if event.widget is not self or event.width == self._last_width:
+            return
+        # Drag-resizing fires a burst of <Configure> events; collapse them into
+        # a single layout pass once the width settles.
+        if self._resize_after_id:
+            self.after_cancel(self._resize_after_id)
+            self._resize_after_id = None
+        if (event.width < COMPACT_WIDTH_BREAKPOINT) == self._current_layout_compact:
+            # Same side of the breakpoint: nothing to re-layout
+            self._last_width = event.width
             return
-        self._apply_layout(event.width < COMPACT_WIDTH_BREAKPOINT)
+        self._resize_after_id = self.after(
+            RESIZE_DEBOUNCE_MS, lambda w=event.width: self._apply_resized_width(w)
+        )
+
+    def _apply_resized_width(self, width: int) -> None:
+        self._resize_after_id = None
+        self._last_width = width
+        self._apply_layout(width < COMPACT_WIDTH_BREAKPOINT)
 
     def _refresh_adb_path_status(self) -> None:
-        adb_path = which(ADB_EXE)
+        adb_path = self._adb_path = _cached_which_adb()
         if adb_path:
             self.adb_path_lbl.configure(text=f"已找到: {adb_path}")
         else:
@@ -426,18 +390,37 @@ class LogCollectorUI(tk.Tk):
             self.bugreport_dir.set(sel)
 
     def refresh_devices(self) -> None:
-        devices = list_adb_devices()
+        # `adb devices` may block on server start/USB enumeration; keep it off
+        # the Tk event loop and apply the result back on the main thread.
+        if self._refresh_in_flight:
+            return
+        self._refresh_in_flight = True
+        self.btn_refresh.configure(state=tk.DISABLED)
+        threading.Thread(target=self._refresh_devices_worker, daemon=True).start()
+
+    def _refresh_devices_worker(self) -> None:
+        devices: List[Device] = []
+        try:
+            devices = list_adb_devices()
+        finally:
+            if self._threaded_tcl:
+                self.after(0, self._apply_device_list, devices)
+            else:
+                # no Tk calls from this thread; _poll_output_queue applies it
+                self._pending_devices = devices
+
+    def _apply_device_list(self, devices: List[Device]) -> None:
+        self._refresh_in_flight = False
+        self.btn_refresh.configure(state=tk.NORMAL)
         self.devices = devices
+        self._label_index = {d.label: d for d in devices}
         labels = [d.label for d in devices]
         self.device_combo.configure(values=labels)
         # Auto-select the first 'device' state if any
+        # (current() also updates the bound textvariable)
         selected_idx = next((i for i, d in enumerate(devices) if d.state == "device"), -1)
-        if selected_idx >= 0:
-            self.device_combo.current(selected_idx)
-            self.selected_device.set(labels[selected_idx])
-        elif labels:
-            self.device_combo.current(0)
-            self.selected_device.set(labels[0])
+        if labels:
+            self.device_combo.current(selected_idx if selected_idx >= 0 else 0)
         else:
             self.selected_device.set("")
         if not labels:
@@ -448,8 +431,10 @@ class LogCollectorUI(tk.Tk):
         if self.proc is not None:
             return
 
-        # Validate ADB
-        if not which(ADB_EXE):
+        # Validate ADB (re-check only if it was missing, e.g. installed since)
+        if not self._adb_path:
+            self._refresh_adb_path_status()
+        if not self._adb_path:
             messagebox.showerror("錯誤", "找不到 adb，請先安裝並加入 PATH。")
             return
 
@@ -458,19 +443,15 @@ class LogCollectorUI(tk.Tk):
         if not sel_label:
             messagebox.showwarning("提示", "請先選擇裝置。")
             return
-        # Resolve serial by matching label
-        serial = None
-        for d in self.devices:
-            if d.label == sel_label:
-                serial = d.serial
-                state = d.state
-                break
-        if not serial:
+        # Resolve serial by label
+        dev = self._label_index.get(sel_label)
+        if dev is None:
             messagebox.showwarning("提示", "所選裝置不存在，請重新整理後再試。")
             return
-        if state != "device":
-            messagebox.showwarning("提示", f"裝置狀態為 {state}，請確認已授權且連線正常。")
+        if dev.state != "device":
+            messagebox.showwarning("提示", f"裝置狀態為 {dev.state}，請確認已授權且連線正常。")
             return
+        serial = dev.serial
 
         # Validate directory
         out_dir = Path(self.output_dir.get()).expanduser().resolve()
@@ -504,14 +485,13 @@ class LogCollectorUI(tk.Tk):
         prefix = self.prefix.get().strip() or DEFAULT_PREFIX
 
         # Prepare command
-        script = str(Path(__file__).parent / "logcat_rotate.py")
-        if not Path(script).exists():
+        if not _SCRIPT_EXISTS:
             messagebox.showerror("錯誤", "找不到 logcat_rotate.py，請確認檔案存在於同目錄。")
             return
 
         cmd = [
             sys.executable,
-            script,
+            str(_SCRIPT_PATH),
             "--dir",
             str(out_dir),
             "--prefix",
@@ -528,8 +508,7 @@ class LogCollectorUI(tk.Tk):
             # split keywords by comma/semicolon/newline and pass individually
             raw_kw = self.bugreport_keywords.get()
             if raw_kw:
-                import re as _re
-                for token in _re.split(r"[;,\n]+", raw_kw):
+                for token in _KW_SPLIT_RE.split(raw_kw):
                     kw = token.strip()
                     if kw:
                         cmd += ["--bugreport-keyword", kw]
@@ -537,30 +516,20 @@ class LogCollectorUI(tk.Tk):
             brd = self.bugreport_dir.get().strip() or DEFAULT_BUGREPORT_DIR
             cmd += ["--bugreport-dir", brd]
 
-        env = os.environ.copy()
-        env["ANDROID_SERIAL"] = serial
+        env = {**self._base_env, "ANDROID_SERIAL": serial}
 
         self._append_log(
             f"啟動收集: 裝置={serial}, 目錄={out_dir}, 前綴={prefix}, 保留={retention_int}h, bugreport={'開' if bug_enabled else '關'}, 冷卻={cooldown_int}s, bug目錄={self.bugreport_dir.get().strip() or DEFAULT_BUGREPORT_DIR}\n"
         )
 
         try:
-            # On Windows, avoid opening console window when packaged
-            creationflags = 0
-            startupinfo = None
-            if os.name == "nt":
-                startupinfo = subprocess.STARTUPINFO()  # type: ignore[attr-defined]
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW  # type: ignore[attr-defined]
-
             self.proc = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
+                bufsize=0,
                 env=env,
-                startupinfo=startupinfo,
-                creationflags=creationflags,
+                creationflags=_CREATION_FLAGS,
             )
         except Exception as e:
             self._append_log(f"啟動失敗: {e}\n")
@@ -602,33 +571,118 @@ class LogCollectorUI(tk.Tk):
         proc = self.proc
         try:
             assert proc.stdout is not None
-            for line in proc.stdout:
-                if self._stop_reader.is_set():
+            fd = proc.stdout.fileno()
+            pending = b""
+            while not self._stop_reader.is_set():
+                data = os.read(fd, READ_CHUNK_SIZE)
+                if not data:
                     break
-                self.output_queue.put(line)
+                pending += data
+                # Hand over whole lines only, decoded once per chunk; a newline
+                # byte never splits a UTF-8 sequence.
+                cut = pending.rfind(b"\n") + 1
+                if cut:
+                    self._enqueue_output(_decode_output(pending[:cut]))
+                    pending = pending[cut:]
+            if pending:
+                self._enqueue_output(_decode_output(pending))
         except Exception:
             pass
         finally:
-            self.output_queue.put("\n[子程序結束]\n")
+            self._enqueue_output("\n[子程序結束]\n")
 
-    def _drain_output_queue(self) -> None:
+    def _enqueue_output(self, text: str) -> None:
+        # If the UI falls behind, drop the oldest chunk rather than grow
+        # without bound; the count is reported on the next drain. The reader
+        # thread is the only producer, so checking qsize() first is enough.
+        if self.output_queue.qsize() >= OUTPUT_QUEUE_MAXSIZE:
+            try:
+                self.output_queue.get_nowait()
+                with self._dropped_lock:
+                    self._dropped_chunks += 1
+            except queue.Empty:
+                pass
+        self.output_queue.put(text)
+        # One wakeup per drain: later chunks ride along until the UI clears
+        # the flag, which keeps event storms off the Tk queue.
+        if self._threaded_tcl and not self._wake_pending.is_set():
+            self._wake_pending.set()
+            try:
+                self.event_generate("<<LogData>>", when="tail")
+            except Exception:
+                self._wake_pending.clear()
+
+    def _drain_output_queue(self) -> int:
+        # Coalesce everything queued since the last tick into one Text insert;
+        # cap the batch so a burst cannot stall redraw for too long.
+        self._wake_pending.clear()
+        parts: List[str] = []
+        size = 0
+        lines = 0
+        capped = False
         try:
-            while True:
-                line = self.output_queue.get_nowait()
-                self._append_log(line)
+            while not capped:
+                chunk = self.output_queue.get_nowait()
+                parts.append(chunk)
+                size += len(chunk)
+                lines += chunk.count("\n")
+                capped = size >= DRAIN_MAX_CHARS or lines >= DRAIN_MAX_LINES
         except queue.Empty:
             pass
-        # Re-schedule
-        self.after(120, self._drain_output_queue)
+        if self._dropped_chunks:
+            with self._dropped_lock:
+                dropped, self._dropped_chunks = self._dropped_chunks, 0
+            parts.insert(0, f"\n[輸出過多，已略過 {dropped} 段]\n")
+        if parts:
+            self._append_log("".join(parts))
+        # Come back right away if the cap left data behind
+        if capped:
+            self.after(1, self._drain_output_queue)
+        return lines
+
+    def _poll_output_queue(self) -> None:
+        # Only one refresh is in flight, so the worker cannot overwrite the
+        # list between this read and the reset
+        if self._pending_devices is not None:
+            devices = self._pending_devices
+            self._pending_devices = None
+            self._apply_device_list(devices)
+        # Adaptive interval: tighten under bursts, back off when idle
+        lines = self._drain_output_queue()
+        if lines:
+            self._idle_polls = 0
+        else:
+            self._idle_polls += 1
+        if lines >= POLL_BURST_LINES:
+            delay = POLL_BURST_MS
+        elif self._idle_polls > POLL_IDLE_TICKS:
+            delay = POLL_IDLE_MS
+        else:
+            delay = FALLBACK_POLL_MS
+        self.after(delay, self._poll_output_queue)
 
     # Log helper
     def _append_log(self, text: str) -> None:
+        # Follow the tail only if the view is already at the bottom, so the
+        # user can scroll back through history while output keeps arriving.
+        at_bottom = self.text.yview()[1] >= 0.999
         self.text.insert(tk.END, text)
-        self.text.see(tk.END)
+        self._lines_since_trim += text.count("\n")
+        if self._lines_since_trim >= TRIM_CHECK_LINES:
+            self._lines_since_trim = 0
+            self._trim_log()
+        if at_bottom:
+            self.text.see(tk.END)
+
+    def _trim_log(self) -> None:
+        # Keep only the newest MAX_LOG_LINES lines so long runs stay bounded
+        lines = int(self.text.index("end-1c").split(".")[0])
+        if lines > MAX_LOG_LINES:
+            self.text.delete("1.0", f"{lines - MAX_LOG_LINES + 1}.0")
 
 
 def main() -> int:
-    if not which(ADB_EXE):
+    if not _cached_which_adb():
         # Show a minimal message before UI in case of headless
         print("找不到 adb，請先安裝 Android Platform Tools 並將 adb 加入 PATH。", file=sys.stderr)
     app = LogCollectorUI()
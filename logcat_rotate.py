@@ -1,34 +1,38 @@
 import argparse
-import csv
+import io
 import os
+import queue
 import re
+import shutil
 import signal
 import subprocess
 import sys
 import threading
 import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 
 
 # logcat -v threadtime pattern
 # Format: MM-DD HH:MM:SS.mmm PID TID LEVEL TAG: message
+# Groups (positional, unpacked via m.groups()): md, hms, pid, tid, level, tag, msg
 LINE_RE = re.compile(
-    r"^(?P<md>\d{2}-\d{2})\s+"
-    r"(?P<hms>\d{2}:\d{2}:\d{2}\.\d{3})\s+"
-    r"(?P<pid>\d+)\s+"
-    r"(?P<tid>\d+)\s+"
-    r"(?P<level>[VDIWEF])\s+"
-    r"(?P<tag>[^:]+):\s+"
-    r"(?P<msg>.*)$"
+    r"^(\d{2}-\d{2})\s+"
+    r"(\d{2}:\d{2}:\d{2}\.\d{3})\s+"
+    r"(\d+)\s+"
+    r"(\d+)\s+"
+    r"([VDIWEF])\s+"
+    r"([^:]+):\s+"
+    r"(.*)$"
 )
 
 # Bluetooth tags and keywords (kept minimal and additive use only)
-BT_TAGS = {
+BT_TAGS = frozenset({
     # Narrowed to GATT-specific tags to reduce noise
     "BtGatt",
     "BtGatt.GattService",
-}
+})
 
 BT_KEYWORDS = [
     # Narrowed to GATT timeout keywords
@@ -38,8 +42,43 @@ BT_KEYWORDS = [
     "gatt timeout",
 ]
 
+# one-pass scan over lowercased text instead of testing each keyword in turn
+BT_KEYWORDS_RE = re.compile("|".join(re.escape(k) for k in BT_KEYWORDS))
+GATT_SC_TIMEOUT_RE = re.compile(
+    r"gatt_indication_confirmation_timeout|service changed notification timed out"
+)
+
+# Necessary (not sufficient) conditions on the lowercased line; a line failing
+# a gate cannot satisfy the corresponding detector, so it is skipped outright.
+# "time" covers both "...confirmation_timeout" and "timed out".
+GATT_SC_TIMEOUT_GATE = "time"
+GATT_CONGESTION_GATE = "bta_gattc_cmpl_cback"
+CRASH_TAGS = ("AndroidRuntime", "libc")
+ERROR_LEVELS = frozenset({"E", "F"})
+# non-E/F lines can only hit the BT issue detector through these words
+BT_ISSUE_GATE_RE = re.compile(r"crash|fatal|assert|anr")
+# All gate categories in one pass: the zero-width lookahead lets finditer report
+# hits at every offset, so overlapping words cannot hide each other (no gate
+# word is a prefix of another, so one alternative per offset is enough).
+TRIGGER_CATEGORY_RE = re.compile(
+    "(?="
+    f"(?P<sc>{re.escape(GATT_SC_TIMEOUT_GATE)})"
+    f"|(?P<congestion>{re.escape(GATT_CONGESTION_GATE)})"
+    f"|(?P<bt>{BT_ISSUE_GATE_RE.pattern})"
+    ")"
+)
+
+# \w is exactly str.isalnum() plus "_" for str patterns
+REASON_UNSAFE_RE = re.compile(r"[^\w.]+")
+
 GATT_CONGESTION_STATUS_RE = re.compile(r"status\s*[:=]\s*(142|0x8e)", re.IGNORECASE)
 
+# Crash detection (only searched after the tag and literal prefix checks pass)
+FATAL_RE = re.compile(r"FATAL EXCEPTION:\s*([^\s]+)")
+PROCESS_RE = re.compile(r"Process:\s*([^,\s]+)")
+FATAL_SIGNAL_RE = re.compile(r"Fatal signal\s+\d+\s+\(([^)]+)\)")
+NATIVE_PKG_TAIL_RE = re.compile(r"\(([^)]+)\)\s*$")
+
 
 LOGCAT_SINCE_SUPPORT: bool | None = None
 
@@ -72,17 +111,21 @@ def _ensure_logcat_since_support() -> bool:
 
 
 class BugreportController:
+    # Event gives a thread-safe flag whose is_set() needs no lock round-trip;
+    # is_enabled() is read for every logcat line
     def __init__(self, initial: bool):
-        self._enabled = initial
-        self._lock = threading.Lock()
+        self._enabled = threading.Event()
+        if initial:
+            self._enabled.set()
 
     def set_enabled(self, value: bool) -> None:
-        with self._lock:
-            self._enabled = value
+        if value:
+            self._enabled.set()
+        else:
+            self._enabled.clear()
 
     def is_enabled(self) -> bool:
-        with self._lock:
-            return self._enabled
+        return self._enabled.is_set()
 
 
 class BugreportCLIControl(threading.Thread):
@@ -128,38 +171,140 @@ class BugreportCLIControl(threading.Thread):
             sys.stderr.flush()
 
 
-def parse_logcat_line(line: str):
-    m = LINE_RE.match(line.strip())
-    if not m:
-        return None
-    now = datetime.now()
-    year = now.year
-    md = m.group("md")
-    hms = m.group("hms")
-    ts_str = f"{year}-{md} {hms}"
-    try:
-        ts = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S.%f")
-    except ValueError:
+# logcat timestamps carry no year; refreshed by the cleanup loop instead of
+# calling datetime.now() for every line
+_YEAR = datetime.now().year
+
+
+def refresh_current_year() -> None:
+    global _YEAR
+    _YEAR = datetime.now().year
+
+
+# logcat bursts share timestamps; keep the most recent few parsed datetimes
+_TS_CACHE: dict[tuple[int, str, str], datetime] = {}
+_TS_CACHE_MAX = 64
+# strptime's own field patterns for %m-%d and %H:%M:%S.%f (two-digit forms)
+_STRPTIME_MD_RE = re.compile(r"(?:1[0-2]|0[1-9])-(?:3[01]|[12]\d|0[1-9])\Z")
+_STRPTIME_HMS_RE = re.compile(r"(?:2[0-3]|[0-1]\d):[0-5]\d:(?:6[0-1]|[0-5]\d)\.[0-9]{3}\Z")
+
+
+def _parse_timestamp(year: int, md: str, hms: str) -> datetime | None:
+    key = (year, md, hms)
+    ts = _TS_CACHE.get(key)
+    if ts is None:
+        # md/hms already have the fixed "MM-DD" / "HH:MM:SS.mmm" shape, but \d
+        # and isdecimal() also accept non-ASCII digits; keep strptime's verdict
+        # on those (it only allows them in a few positions)
+        if not (md.isascii() and hms.isascii()) and not (
+            _STRPTIME_MD_RE.match(md) and _STRPTIME_HMS_RE.match(hms)
+        ):
+            return None
+        try:
+            ts = datetime(
+                year,
+                int(md[:2]),
+                int(md[3:5]),
+                int(hms[:2]),
+                int(hms[3:5]),
+                int(hms[6:8]),
+                int(hms[9:12]) * 1000,
+            )
+        except ValueError:
+            return None
+        if len(_TS_CACHE) >= _TS_CACHE_MAX:
+            del _TS_CACHE[next(iter(_TS_CACHE))]
+        _TS_CACHE[key] = ts
+    return ts
+
+
+def _is_threadtime_fields(parts: list[str]) -> bool:
+    # Positional equivalent of LINE_RE for the common "TAG: msg" shape; anything
+    # unusual (tags with spaces, "TAG :" etc.) is left to the regex.
+    md, hms, pid, tid, level, tag = parts[0], parts[1], parts[2], parts[3], parts[4], parts[5]
+    return (
+        len(level) == 1
+        and level in "VDIWEF"
+        and len(md) == 5
+        and md[2] == "-"
+        and len(hms) == 12
+        and hms[2] == ":"
+        and hms[5] == ":"
+        and hms[8] == "."
+        and tag.endswith(":")
+        and len(tag) > 1
+        and ":" not in tag[:-1]
+        and pid.isdecimal()
+        and tid.isdecimal()
+        and (md[:2] + md[3:]).isdecimal()
+        and (hms[:2] + hms[3:5] + hms[6:8] + hms[9:]).isdecimal()
+    )
+
+
+@dataclass
+class LogRec:
+    # Explicit slots (dataclass(slots=True) needs Python 3.10+); one small
+    # object per line instead of a dict
+    __slots__ = ("timestamp", "pid", "tid", "level", "tag", "message")
+
+    timestamp: datetime
+    pid: str
+    tid: str
+    level: str
+    tag: str
+    message: str
+
+
+def parse_logcat_line(line: str) -> LogRec | None:
+    parts = line.split(None, 6)
+    if len(parts) == 7 and _is_threadtime_fields(parts):
+        md, hms, pid, tid, level, tag, msg = parts
+        tag = tag[:-1]
+        msg = msg.rstrip()
+    else:
+        m = LINE_RE.match(line.strip())
+        if not m:
+            return None
+        md, hms, pid, tid, level, tag, msg = m.groups()
+    ts = _parse_timestamp(_YEAR, md, hms)
+    if ts is None:
         return None
-    return {
-        "timestamp": ts,
-        "pid": m.group("pid"),
-        "tid": m.group("tid"),
-        "level": m.group("level"),
-        "tag": m.group("tag"),
-        "message": m.group("msg"),
-    }
+    return LogRec(ts, pid, tid, level, tag, msg)
+
+
+# Same output as csv.writer defaults (QUOTE_MINIMAL, "\r\n" line endings)
+CSV_LINE_END = "\r\n"
+# rows are joined and encoded per batch, then written to a binary file
+CSV_FILE_BUFFER = 1 << 16
+CSV_BATCH_ROWS = 256
+CSV_BATCH_CHARS = 1 << 16
+# bound how long buffered rows may sit unwritten when logcat goes quiet
+CSV_FLUSH_INTERVAL_SEC = 0.5
+_csv_needs_quote = re.compile(r'[,"\r\n]').search
 
 
 class CSVRotator:
     def __init__(self, out_dir: Path, prefix: str):
         self.out_dir = out_dir
+        self._out_dir_s = os.fspath(out_dir)
         self.prefix = prefix
         self.current_minute_key = None
         self.current_bucket_key = None
+        # wall-clock minute number of the open file; one int compare per row
+        self._current_minute_no = None
+        # "YYYY-MM-DD HH:MM:" shared by every row of the open minute file
+        self._row_ts_prefix = ""
+        # bucket folder of the open file; makedirs only runs when it changes
+        self._current_folder = None
         self.file = None
-        self.writer = None
         self.header = ["timestamp", "pid", "tid", "level", "tag", "message"]
+        self._header_line = (",".join(self.header) + CSV_LINE_END).encode("utf-8")
+        # formatted lines are buffered; flushed on rollover/close
+        self._buf = []
+        self._buf_chars = 0
+        # the writer thread flushes while the main thread may close; RLock since a
+        # minute rollover calls close() from inside write_row/write_rows
+        self._lock = threading.RLock()
         self.out_dir.mkdir(parents=True, exist_ok=True)
 
     def _minute_key(self, dt: datetime):
@@ -170,98 +315,367 @@ class CSVRotator:
         bucket_min = (dt.minute // 5) * 5
         return dt.replace(minute=bucket_min, second=0, microsecond=0).strftime("%Y-%m-%d_%H-%M")
 
-    def _file_path_for(self, dt: datetime) -> Path:
-        bucket = self._bucket_key(dt)
-        minute = self._minute_key(dt)
-        folder = self.out_dir / bucket
-        folder.mkdir(parents=True, exist_ok=True)
-        return folder / f"{self.prefix}_{minute}.csv"
+    def _file_path_for(self, bucket: str, minute: str) -> str:
+        # plain strings: this runs on every rollover and open() takes str directly
+        folder = os.path.join(self._out_dir_s, bucket)
+        if folder != self._current_folder:
+            os.makedirs(folder, exist_ok=True)
+            self._current_folder = folder
+        return os.path.join(folder, f"{self.prefix}_{minute}.csv")
 
     def _open_for_dt(self, dt: datetime):
+        minute_no = dt.toordinal() * 1440 + dt.hour * 60 + dt.minute
+        if minute_no == self._current_minute_no and self.file and not self.file.closed:
+            return
         min_key = self._minute_key(dt)
         bucket_key = self._bucket_key(dt)
-        if (
-            min_key == self.current_minute_key
-            and bucket_key == self.current_bucket_key
-            and self.file
-            and not self.file.closed
-        ):
-            return
         self.close()
-        path = self._file_path_for(dt)
-        is_new = not path.exists()
-        self.file = path.open("a", encoding="utf-8", newline="")
-        self.writer = csv.writer(self.file)
-        if is_new:
-            self.writer.writerow(self.header)
+        path = self._file_path_for(bucket_key, min_key)
+        try:
+            self.file = open(path, "ab", buffering=CSV_FILE_BUFFER)
+        except FileNotFoundError:
+            # the cleaner may have removed an emptied bucket folder we created earlier
+            self._current_folder = None
+            path = self._file_path_for(bucket_key, min_key)
+            self.file = open(path, "ab", buffering=CSV_FILE_BUFFER)
+        # append mode starts at EOF, so position 0 means an empty/new file
+        if self.file.tell() == 0:
+            self.file.write(self._header_line)
         self.current_minute_key = min_key
         self.current_bucket_key = bucket_key
+        self._current_minute_no = minute_no
+        self._row_ts_prefix = f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}:"
 
-    def write_row(self, row: dict):
-        ts = row["timestamp"]
+    def write_row(self, row: LogRec):
+        with self._lock:
+            self._write_row(row)
+
+    def write_rows(self, rows):
+        with self._lock:
+            for row in rows:
+                self._write_row(row)
+
+    def _write_row(self, row: LogRec):
+        ts = row.timestamp
         self._open_for_dt(ts)
-        self.writer.writerow([
-            ts.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
-            row["pid"],
-            row["tid"],
-            row["level"],
-            row["tag"],
-            row["message"],
-        ])
+        # pid/tid/level are plain tokens; only tag and message may need quoting
+        tag = row.tag
+        if _csv_needs_quote(tag):
+            tag = '"' + tag.replace('"', '""') + '"'
+        msg = row.message
+        if _csv_needs_quote(msg):
+            msg = '"' + msg.replace('"', '""') + '"'
+        line = (
+            f"{self._row_ts_prefix}{ts.second:02d}.{ts.microsecond // 1000:03d},"
+            f"{row.pid},{row.tid},{row.level},{tag},{msg}{CSV_LINE_END}"
+        )
+        self._buf.append(line)
+        self._buf_chars += len(line)
+        if len(self._buf) >= CSV_BATCH_ROWS or self._buf_chars >= CSV_BATCH_CHARS:
+            self._flush_buffer()
+
+    def _flush_buffer(self):
+        if self._buf and self.file:
+            self.file.write("".join(self._buf).encode("utf-8"))
+        self._buf.clear()
+        self._buf_chars = 0
+
+    def flush(self):
+        with self._lock:
+            if self.file and not self.file.closed:
+                try:
+                    self._flush_buffer()
+                    self.file.flush()
+                except Exception:
+                    pass
 
     def close(self):
-        if self.file and not self.file.closed:
-            try:
-                self.file.flush()
-            except Exception:
-                pass
+        with self._lock:
+            if self.file and not self.file.closed:
+                try:
+                    self._flush_buffer()
+                except Exception:
+                    pass
+                try:
+                    self.file.flush()
+                    os.fsync(self.file.fileno())
+                except Exception:
+                    pass
+                try:
+                    self.file.close()
+                except Exception:
+                    pass
+            self._buf.clear()
+            self._buf_chars = 0
+            self.file = None
+            self.current_minute_key = None
+            self.current_bucket_key = None
+            self._current_minute_no = None
+
+
+WRITE_QUEUE_MAXSIZE = 10000
+WRITE_BATCH_MAX = 1024
+
+
+class CSVWriterThread(threading.Thread):
+    # Absorbs short disk stalls. A full queue blocks the caller (consume_lines)
+    # instead of dropping rows; line_q then fills and blocks the reading loop,
+    # so a sustained stall backpressures all the way into adb's pipe.
+    def __init__(self, rotator: CSVRotator, maxsize: int = WRITE_QUEUE_MAXSIZE):
+        super().__init__(daemon=True)
+        self.rotator = rotator
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def submit(self, rec: LogRec) -> None:
+        self.queue.put(rec)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self.join(timeout)
+
+    def run(self) -> None:
+        q = self.queue
+        last_flush = time.monotonic()
+        dirty = False
+        while True:
             try:
-                self.file.close()
-            except Exception:
-                pass
-        self.file = None
-        self.writer = None
-        self.current_minute_key = None
-        self.current_bucket_key = None
+                batch = [q.get(timeout=CSV_FLUSH_INTERVAL_SEC)]
+            except queue.Empty:
+                batch = []
+            while len(batch) < WRITE_BATCH_MAX:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            done = None in batch
+            if done:
+                batch = batch[:batch.index(None)]
+            if batch:
+                try:
+                    self.rotator.write_rows(batch)
+                    dirty = True
+                except Exception as e:
+                    print(f"[warn] csv write failed: {e}", file=sys.stderr)
+            if done:
+                return
+            now = time.monotonic()
+            if dirty and now - last_flush >= CSV_FLUSH_INTERVAL_SEC:
+                # submit() blocks on a full queue, so this thread must outlive I/O errors
+                try:
+                    self.rotator.flush()
+                except Exception as e:
+                    print(f"[warn] csv flush failed: {e}", file=sys.stderr)
+                last_flush = now
+                dirty = False
 
 
-def try_delete_if_old(path: Path, cutoff_epoch: float):
+def try_delete_if_old(entry: os.DirEntry, cutoff_epoch: float):
     try:
-        if path.stat().st_mtime < cutoff_epoch:
-            path.unlink(missing_ok=True)
+        if entry.stat().st_mtime < cutoff_epoch:
+            os.unlink(entry.path)
     except FileNotFoundError:
         pass
     except Exception:
         pass
 
 
+CLEANUP_SUFFIXES = frozenset({".csv", ".txt"})
+
+
+def _is_cleanup_target(name: str) -> bool:
+    suffix = os.path.splitext(name)[1].lower()
+    if suffix in CLEANUP_SUFFIXES:
+        return True
+    # Also clean up bugreport zips older than retention (e.g., 36h)
+    return suffix == ".zip" and "bugreport" in name.lower()
+
+
+BUCKET_SPAN_SEC = 5 * 60
+
+
+def _bucket_start_epoch(name: str) -> float | None:
+    # CSVRotator bucket folders are named after their first minute
+    try:
+        return datetime.strptime(name, "%Y-%m-%d_%H-%M").timestamp()
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+def _only_cleanup_targets(path: str) -> bool:
+    # rmtree is only a shortcut for deleting every file one by one; anything
+    # else in the folder (subfolders, other file types) must survive
+    try:
+        with os.scandir(path) as it:
+            return all(not e.is_dir() and _is_cleanup_target(e.name) for e in it)
+    except OSError:
+        return False
+
+
+def _cleanup_dir(path: str, cutoff: float, now: float | None = None):
+    # now is only passed for the top-level log directory, where bucket folders
+    # are judged by name; it is None when recursing.
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_dir():
+                # like os.walk: symlinked folders are listed but not descended
+                if entry.is_symlink():
+                    continue
+                start = _bucket_start_epoch(entry.name) if now is not None else None
+                if start is not None:
+                    end = start + BUCKET_SPAN_SEC
+                    if end < cutoff:
+                        # bucket names come from device time; also require the
+                        # folder itself to be stale in case that clock lags
+                        if entry.stat().st_mtime < cutoff and _only_cleanup_targets(entry.path):
+                            shutil.rmtree(entry.path, ignore_errors=True)
+                            continue
+                    elif end <= now + BUCKET_SPAN_SEC:
+                        # whole bucket is still within retention; a device clock
+                        # running ahead only delays deletion, never hastens it
+                        continue
+                _cleanup_dir(entry.path, cutoff)
+            elif _is_cleanup_target(entry.name):
+                try_delete_if_old(entry, cutoff)
+        except OSError:
+            pass
+    # rmdir refuses non-empty folders, so no separate emptiness listing
+    try:
+        os.rmdir(path)
+    except OSError:
+        pass
+
+
 def cleanup_old_logs(directory: Path, retention_hours: int, prefix: str):
     now = time.time()
     cutoff = now - retention_hours * 3600
-    for root, dirs, files in os.walk(directory, topdown=False):
-        root_path = Path(root)
-        for name in files:
-            p = root_path / name
-            if p.suffix.lower() in {".csv", ".txt"}:
-                try_delete_if_old(p, cutoff)
-            # Also clean up bugreport zips older than retention (e.g., 36h)
-            if p.suffix.lower() == ".zip" and "bugreport" in p.name.lower():
-                try_delete_if_old(p, cutoff)
-        try:
-            if not any(Path(root).iterdir()):
-                Path(root).rmdir()
-        except Exception:
-            pass
+    _cleanup_dir(os.fspath(directory), cutoff, now)
 
 
 def cleanup_old_logs_loop(stop_event: threading.Event, directory: Path, retention_hours: int, prefix: str, interval_sec: int = 300):
     while not stop_event.wait(timeout=interval_sec):
+        refresh_current_year()
         try:
             cleanup_old_logs(directory, retention_hours, prefix)
         except Exception:
             pass
 
 
+MIRROR_BATCH_LINES = 64
+MIRROR_FLUSH_INTERVAL_SEC = 0.1
+
+
+# Batch the stdout echo; stay per-line on a terminal so it remains interactive
+class StdoutMirror:
+    def __init__(self, stream, batch_lines: int = MIRROR_BATCH_LINES):
+        self.stream = stream
+        self.batch_lines = batch_lines
+        self._buf = []
+        self._lock = threading.RLock()
+        try:
+            self.interactive = stream.isatty()
+        except Exception:
+            self.interactive = False
+        # batched output bypasses the text layer: one encode + one write per batch
+        self._raw = None if self.interactive else getattr(stream, "buffer", None)
+        self._encoding = getattr(stream, "encoding", None) or "utf-8"
+
+    def write(self, line: str):
+        if self.interactive:
+            try:
+                self.stream.write(line)
+                self.stream.flush()
+            except Exception:
+                pass
+            return
+        with self._lock:
+            self._buf.append(line)
+            if len(self._buf) >= self.batch_lines:
+                self._flush_buffer()
+
+    def write_lines(self, lines):
+        if self.interactive:
+            for line in lines:
+                self.write(line)
+            return
+        with self._lock:
+            self._buf.extend(lines)
+            if len(self._buf) >= self.batch_lines:
+                self._flush_buffer()
+
+    def _flush_buffer(self):
+        if not self._buf:
+            return
+        data = "".join(self._buf)
+        self._buf.clear()
+        try:
+            # one character the stdout codepage lacks (cp950/cp1252 pipes) must
+            # not fail the whole batch, so unencodable characters are replaced
+            if self._raw is not None:
+                self._raw.write(data.encode(self._encoding, "replace"))
+                self._raw.flush()
+            else:
+                try:
+                    self.stream.write(data)
+                except UnicodeEncodeError:
+                    self.stream.write(data.encode(self._encoding, "replace").decode(self._encoding))
+                self.stream.flush()
+        except Exception:
+            pass
+
+    def flush(self):
+        with self._lock:
+            self._flush_buffer()
+
+
+def periodic_flush_loop(stop_event: threading.Event, target, interval_sec: float):
+    while not stop_event.wait(timeout=interval_sec):
+        target.flush()
+
+
+READ_CHUNK_SIZE = 1 << 16
+# batches (one per read chunk) waiting for the parse/trigger thread
+LINE_QUEUE_MAXSIZE = 256
+
+
+def _decode_lines(data: bytes):
+    text = data.decode("utf-8", errors="replace")
+    # same newline handling as the text-mode pipe this replaces
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return io.StringIO(text)
+
+
+def iter_logcat_batches(fd: int):
+    # Read raw chunks and only decode complete lines; "\n" never occurs inside
+    # a UTF-8 multibyte sequence, so splitting there is safe. Yields the lines
+    # of each chunk as one list.
+    tail = b""
+    while True:
+        try:
+            chunk = os.read(fd, READ_CHUNK_SIZE)
+        except OSError:
+            break
+        if not chunk:
+            break
+        data = tail + chunk if tail else chunk
+        idx = data.rfind(b"\n")
+        if idx < 0:
+            tail = data
+            continue
+        tail = data[idx + 1:]
+        yield list(_decode_lines(data[:idx + 1]))
+    if tail:
+        yield list(_decode_lines(tail))
+
+
 def build_logcat_cmd_from_now() -> tuple[list[str], datetime | None]:
     base = ["adb", "logcat", "-v", "threadtime"]
     if not _ensure_logcat_since_support():
@@ -283,9 +697,96 @@ def build_logcat_cmd_from_now() -> tuple[list[str], datetime | None]:
     return base + ["-T", "1"], None
 
 
+# Original generic BT issue detector (additive; not changing other logic)
+# Detectors take the tag/message/raw line already lowercased once per line;
+# callers have already checked bug_enabled for that line
+def should_trigger_bt_issue(rec: LogRec, tag_l: str, msg: str, raw: str) -> bool:
+    lvl = (rec.level or "").upper()
+    tag = (rec.tag or "").strip()
+    if tag in BT_TAGS or "bluetooth" in tag_l or tag_l.startswith("bt"):
+        if lvl in ERROR_LEVELS:
+            return True
+    if BT_KEYWORDS_RE.search(msg):
+        if lvl in ERROR_LEVELS or "anr" in msg or "crash" in msg:
+            return True
+    if ("bluetooth" in raw or raw.startswith("bt")) and ("crash" in raw or "fatal" in raw or "assert" in raw):
+        return True
+    return False
+
+
+# Original minute-rollover onNotify detector (run from consume_lines)
+def _is_bt_notify(tag: str, msg: str, raw: str) -> bool:
+    try:
+        if ("gattservice" in tag or "btgatt" in tag or tag == "btgatt.gattservice") and "onnotify" in msg:
+            return True
+        if "gattservice" in raw and "onnotify" in raw:
+            return True
+    except Exception:
+        pass
+    return False
+
+
+def _is_gatt_service_changed_timeout(msg: str, raw: str) -> bool:
+    try:
+        # Robust match for the target error
+        if GATT_SC_TIMEOUT_RE.search(msg) or GATT_SC_TIMEOUT_RE.search(raw):
+            return True
+        if "gatt_utils.cc" in raw and "timed out" in raw and "service changed" in raw:
+            return True
+    except Exception:
+        pass
+    return False
+
+
+def _is_gatt_congestion_event(msg: str, raw: str) -> bool:
+    try:
+        if "bta_gattc_cmpl_cback" in raw or "bta_gattc_cmpl_cback" in msg:
+            if GATT_CONGESTION_STATUS_RE.search(raw) or GATT_CONGESTION_STATUS_RE.search(msg):
+                return True
+            if "gatt_congested" in raw or "gatt_congested" in msg:
+                return True
+            if "gatt_busy" in raw or "gatt_busy" in msg:
+                return True
+    except Exception:
+        pass
+    return False
+
+
+def build_trigger_gate_re(custom_keywords: list[str]) -> re.Pattern:
+    # Union of every keyword gate: most lines miss all of them and are rejected
+    # with this single case-insensitive scan of the raw line, before any
+    # lowercase copy is made. IGNORECASE matches at least everything that
+    # "kw in line.lower()" would, so nothing that could trigger is skipped.
+    return re.compile(
+        "|".join(
+            [re.escape(GATT_SC_TIMEOUT_GATE), re.escape(GATT_CONGESTION_GATE), BT_ISSUE_GATE_RE.pattern]
+            + [re.escape(k) for k in custom_keywords]
+        ),
+        re.IGNORECASE,
+    )
+
+
+def trigger_checks(
+    rec: LogRec, line: str, gate_re: re.Pattern, has_custom: bool
+) -> tuple[str | None, bool, bool, bool, bool, bool]:
+    # Decide per detector from the cheap gates first. Returns the lowercased
+    # line (None when no keyword detector can match) and the check_sc,
+    # check_congestion, check_crash, check_bt, check_custom flags.
+    level_ef = rec.level in ERROR_LEVELS
+    check_crash = rec.tag.strip() in CRASH_TAGS
+    if not (level_ef or gate_re.search(line)):
+        return None, False, False, check_crash, False, False
+    line_l = line.lower()
+    hits = {m.lastgroup for m in TRIGGER_CATEGORY_RE.finditer(line_l)}
+    return line_l, "sc" in hits, "congestion" in hits, check_crash, level_ef or "bt" in hits, has_custom
+
+
 def run(args):
     out_dir = Path(args.dir)
     rotator = CSVRotator(out_dir, args.prefix)
+    mirror = StdoutMirror(sys.stdout)
+    csv_writer = CSVWriterThread(rotator)
+    csv_writer.start()
 
     stop_event = threading.Event()
     cleaner = threading.Thread(
@@ -294,6 +795,13 @@ def run(args):
         daemon=True,
     )
     cleaner.start()
+    if not mirror.interactive:
+        mirror_flusher = threading.Thread(
+            target=periodic_flush_loop,
+            args=(stop_event, mirror, MIRROR_FLUSH_INTERVAL_SEC),
+            daemon=True,
+        )
+        mirror_flusher.start()
 
     # bugreport trigger control
     bugreport_controller = BugreportController(not getattr(args, "no_bugreport", False))
@@ -329,89 +837,21 @@ def run(args):
                     custom_keywords.append(kw)
     except Exception:
         custom_keywords = []
+    # gate on a single scan; the list is only walked on a hit so the reported
+    # keyword stays the first configured one that matches
+    custom_keywords_re = (
+        re.compile("|".join(re.escape(k) for k in custom_keywords)) if custom_keywords else None
+    )
+    trigger_gate_re = build_trigger_gate_re(custom_keywords)
 
-    # Original generic BT issue detector (additive; not changing other logic)
-    def should_trigger_bt_issue(rec: dict, raw_line: str) -> bool:
-        if not bugreport_controller.is_enabled():
-            return False
-        lvl = (rec.get("level") or "").upper()
-        tag = (rec.get("tag") or "").strip()
-        msg = (rec.get("message") or "").lower()
-        tag_l = tag.lower()
-        if tag in BT_TAGS or "bluetooth" in tag_l or tag_l.startswith("bt"):
-            if lvl in {"E", "F"}:
-                return True
-        if any(k in msg for k in BT_KEYWORDS):
-            if lvl in {"E", "F"} or "anr" in msg or "crash" in msg:
-                return True
-        raw = (raw_line or "").lower()
-        if ("bluetooth" in raw or raw.startswith("bt")) and ("crash" in raw or "fatal" in raw or "assert" in raw):
-            return True
-        return False
-
-    # Original minute-rollover onNotify detector
-    def _minute_key(dt: datetime) -> str:
-        return dt.strftime("%Y-%m-%d_%H-%M")
-
-    def _is_bt_notify(rec: dict, raw_line: str) -> bool:
-        try:
-            tag = (rec.get("tag") or "").lower()
-            msg = (rec.get("message") or "").lower()
-            if ("gattservice" in tag or "btgatt" in tag or tag == "btgatt.gattservice") and "onnotify" in msg:
-                return True
-            raw = (raw_line or "").lower()
-            if "gattservice" in raw and "onnotify" in raw:
-                return True
-        except Exception:
-            pass
-        return False
-
-    prev_min_key = None
-    prev_line = None
-    prev_rec = None
-
-    def _is_gatt_service_changed_timeout(rec: dict, raw_line: str) -> bool:
-        try:
-            msg = (rec.get("message") or "").lower()
-            raw = (raw_line or "").lower()
-            # Robust match for the target error
-            if "gatt_indication_confirmation_timeout" in msg or "gatt_indication_confirmation_timeout" in raw:
-                return True
-            if "service changed notification timed out" in msg or "service changed notification timed out" in raw:
-                return True
-            if "gatt_utils.cc" in raw and "timed out" in raw and "service changed" in raw:
-                return True
-        except Exception:
-            pass
-        return False
-
-    def _is_gatt_congestion_event(rec: dict, raw_line: str) -> bool:
-        try:
-            msg = (rec.get("message") or "").lower()
-            raw = (raw_line or "").lower()
-            if "bta_gattc_cmpl_cback" in raw or "bta_gattc_cmpl_cback" in msg:
-                if GATT_CONGESTION_STATUS_RE.search(raw) or GATT_CONGESTION_STATUS_RE.search(msg):
-                    return True
-                if "gatt_congested" in raw or "gatt_congested" in msg:
-                    return True
-                if "gatt_busy" in raw or "gatt_busy" in msg:
-                    return True
-        except Exception:
-            pass
-        return False
+    def _minute_key(dt: datetime) -> int:
+        # same minute number as CSVRotator; an int compare instead of strftime per line
+        return dt.toordinal() * 1440 + dt.hour * 60 + dt.minute
 
     def _sanitize_reason(reason: str) -> str:
-        # keep simple, filename-safe tokens
-        safe = []
-        for ch in reason.lower():
-            if ch.isalnum():
-                safe.append(ch)
-            elif ch in {'.', '-', '_'}:
-                safe.append(ch)
-            else:
-                safe.append('-')
-        # collapse repeats
-        out = re.sub(r"-+", "-", ''.join(safe)).strip('-')
+        # keep simple, filename-safe tokens; each run of other chars (and of
+        # '-') collapses to a single '-'
+        out = REASON_UNSAFE_RE.sub("-", reason.lower()).strip('-')
         return out[:64] if out else "reason"
 
     def trigger_bugreport_async(reason: str | None = None):
@@ -446,15 +886,10 @@ def run(args):
                 bugreport_running["flag"] = False
 
     # --- Crash detection helpers ---
-    FATAL_RE = re.compile(r"FATAL EXCEPTION:\s*([^\s]+)")
-    PROCESS_RE = re.compile(r"Process:\s*([^,\s]+)")
-    FATAL_SIGNAL_RE = re.compile(r"Fatal signal\s+\d+\s+\(([^)]+)\)")
-    NATIVE_PKG_TAIL_RE = re.compile(r"\(([^)]+)\)\s*$")
-
-    def _extract_crash_reason(rec: dict, raw_line: str, prev_rec: dict | None, prev_line: str | None) -> str | None:
+    def _extract_crash_reason(rec: LogRec, raw_line: str, prev_rec: LogRec | None, prev_line: str | None) -> str | None:
         try:
-            tag = (rec.get("tag") or "").strip()
-            msg = rec.get("message") or ""
+            tag = (rec.tag or "").strip()
+            msg = rec.message or ""
             # Java crash header
             if tag == "AndroidRuntime" and "FATAL EXCEPTION" in msg:
                 m = FATAL_RE.search(msg)
@@ -462,8 +897,8 @@ def run(args):
                 return f"crash_fatal_exception_{thread}"
             # Java crash "Process:" line following header
             if tag == "AndroidRuntime" and msg.startswith("Process:") and prev_line:
-                if prev_rec and prev_rec.get("tag") == "AndroidRuntime" and "FATAL EXCEPTION" in (prev_rec.get("message") or ""):
-                    mthread = FATAL_RE.search(prev_rec.get("message") or "")
+                if prev_rec and prev_rec.tag == "AndroidRuntime" and "FATAL EXCEPTION" in (prev_rec.message or ""):
+                    mthread = FATAL_RE.search(prev_rec.message or "")
                     thread = mthread.group(1) if mthread else "unknown"
                     mpkg = PROCESS_RE.search(msg)
                     pkg = mpkg.group(1) if mpkg else "app"
@@ -485,6 +920,14 @@ def run(args):
 
     def handle_exit(signum, frame):
         stop_event.set()
+        mirror.flush()
+        # let queued lines be processed, then drain queued rows before closing
+        try:
+            line_q.put(None, timeout=5.0)
+        except queue.Full:
+            pass
+        consumer.join(5.0)
+        csv_writer.stop()
         rotator.close()
         try:
             if proc and proc.poll() is None:
@@ -494,9 +937,14 @@ def run(args):
         time.sleep(0.1)
         sys.exit(0)
 
+    def handle_signal(signum, frame):
+        # Only unwind here: the reading loop's finally runs handle_exit once the
+        # interrupted code has released any queue lock it was holding.
+        raise SystemExit(0)
+
     try:
-        signal.signal(signal.SIGINT, handle_exit)
-        signal.signal(signal.SIGTERM, handle_exit)
+        signal.signal(signal.SIGINT, handle_signal)
+        signal.signal(signal.SIGTERM, handle_signal)
     except Exception:
         pass
 
@@ -506,15 +954,130 @@ def run(args):
 
     logcat_cmd, skip_before_ts = build_logcat_cmd_from_now()
 
+    line_q = queue.Queue(maxsize=LINE_QUEUE_MAXSIZE)
+
+    # Parsing, trigger detection and CSV hand-off run here so the reading loop
+    # only drains adb and mirrors to stdout.
+    def consume_lines():
+        prev_min_key = None
+        prev_line = None
+        prev_rec = None
+        while True:
+            batch = line_q.get()
+            if batch is None:
+                return
+            try:
+                for line in batch:
+                    rec = parse_logcat_line(line)
+                    if rec is None:
+                        rec = LogRec(datetime.now(), "", "", "", "", line.strip())
+
+                    if skip_before_ts and rec.timestamp < skip_before_ts:
+                        continue
+
+                    bug_enabled = bugreport_controller.is_enabled()
+
+                    # Check previous-minute tail line for onNotify trigger
+                    try:
+                        cur_key = _minute_key(rec.timestamp)
+                        if prev_min_key is None:
+                            prev_min_key = cur_key
+                        elif cur_key != prev_min_key and prev_rec is not None:
+                            if _is_bt_notify(
+                                (prev_rec.tag or "").lower(),
+                                (prev_rec.message or "").lower(),
+                                (prev_line or "").lower(),
+                            ):
+                                now_t = time.time()
+                                if bug_enabled and (now_t - last_bugreport_time >= args.bugreport_cooldown):
+                                    trigger_bugreport_async()
+                            prev_min_key = cur_key
+                    except Exception:
+                        pass
+
+                    # write to CSV (on the writer thread)
+                    csv_writer.submit(rec)
+
+                    # Lowercased copies are only built when some detector can still
+                    # match, so the common V/D/I chatter gets no lower() at all.
+                    check_sc = check_congestion = check_crash = check_bt = check_custom = False
+                    if bug_enabled:
+                        line_l, check_sc, check_congestion, check_crash, check_bt, check_custom = trigger_checks(
+                            rec, line, trigger_gate_re, custom_keywords_re is not None
+                        )
+                        if check_sc or check_congestion or check_bt:
+                            msg_l = rec.message.lower()
+                            tag_l = rec.tag.strip().lower()
+
+                    # trigger only on GATT Service Changed indication timeout
+                    if check_sc:
+                        try:
+                            if _is_gatt_service_changed_timeout(msg_l, line_l):
+                                now_t = time.time()
+                                if now_t - last_bugreport_time >= args.bugreport_cooldown:
+                                    trigger_bugreport_async()
+                        except Exception:
+                            pass
+
+                    # Trigger when bta_gattc callback reports congestion/busy status
+                    if check_congestion:
+                        try:
+                            if _is_gatt_congestion_event(msg_l, line_l):
+                                now_t = time.time()
+                                if now_t - last_bugreport_time >= args.bugreport_cooldown:
+                                    trigger_bugreport_async()
+                        except Exception:
+                            pass
+            
+                    # App crash trigger (Java or native). Include reason in filename
+                    if check_crash:
+                        try:
+                            reason = _extract_crash_reason(rec, line, prev_rec, prev_line)
+                            if reason:
+                                now_t = time.time()
+                                if now_t - last_bugreport_time >= args.bugreport_cooldown:
+                                    trigger_bugreport_async(reason)
+                        except Exception:
+                            pass
+
+                    # Custom keyword trigger
+                    if check_custom:
+                        try:
+                            hit = None
+                            if custom_keywords_re.search(line_l):
+                                hit = next((k for k in custom_keywords if k in line_l), None)
+                            if hit is not None:
+                                now_t = time.time()
+                                if now_t - last_bugreport_time >= args.bugreport_cooldown:
+                                    trigger_bugreport_async(f"kw_{hit}")
+                        except Exception:
+                            pass
+
+                    # Also keep original generic BT error trigger
+                    if check_bt:
+                        try:
+                            if should_trigger_bt_issue(rec, tag_l, msg_l, line_l):
+                                now_t = time.time()
+                                if now_t - last_bugreport_time >= args.bugreport_cooldown:
+                                    trigger_bugreport_async()
+                        except Exception:
+                            pass
+
+                    # Update previous line tracking
+                    prev_line = line
+                    prev_rec = rec
+            except Exception as e:
+                print(f"[warn] line processing failed: {e}", file=sys.stderr)
+
+    consumer = threading.Thread(target=consume_lines, daemon=True)
+    consumer.start()
+
     try:
         proc = subprocess.Popen(
             logcat_cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            bufsize=1,
-            universal_newlines=True,
-            encoding="utf-8",
-            errors="replace",
+            bufsize=0,
             creationflags=creationflags,
         )
     except FileNotFoundError:
@@ -523,103 +1086,10 @@ def run(args):
         return
 
     try:
-        for line in proc.stdout:
+        for batch in iter_logcat_batches(proc.stdout.fileno()):
             # always mirror to stdout
-            try:
-                sys.stdout.write(line)
-                sys.stdout.flush()
-            except Exception:
-                pass
-
-            rec = parse_logcat_line(line)
-            if rec is None:
-                rec = {
-                    "timestamp": datetime.now(),
-                    "pid": "",
-                    "tid": "",
-                    "level": "",
-                    "tag": "",
-                    "message": line.strip(),
-                }
-
-            if skip_before_ts and rec["timestamp"] < skip_before_ts:
-                continue
-
-            bug_enabled = bugreport_controller.is_enabled()
-
-            # Check previous-minute tail line for onNotify trigger
-            try:
-                cur_key = _minute_key(rec["timestamp"])
-                if prev_min_key is None:
-                    prev_min_key = cur_key
-                elif cur_key != prev_min_key and prev_rec is not None:
-                    if _is_bt_notify(prev_rec, prev_line):
-                        now_t = time.time()
-                        if bug_enabled and (now_t - last_bugreport_time >= args.bugreport_cooldown):
-                            trigger_bugreport_async()
-                    prev_min_key = cur_key
-            except Exception:
-                pass
-
-            # write to CSV
-            rotator.write_row(rec)
-
-            # trigger only on GATT Service Changed indication timeout
-            if bug_enabled:
-                try:
-                    if _is_gatt_service_changed_timeout(rec, line):
-                        now_t = time.time()
-                        if now_t - last_bugreport_time >= args.bugreport_cooldown:
-                            trigger_bugreport_async()
-                except Exception:
-                    pass
-
-            # Trigger when bta_gattc callback reports congestion/busy status
-            if bug_enabled:
-                try:
-                    if _is_gatt_congestion_event(rec, line):
-                        now_t = time.time()
-                        if now_t - last_bugreport_time >= args.bugreport_cooldown:
-                            trigger_bugreport_async()
-                except Exception:
-                    pass
-            
-            # App crash trigger (Java or native). Include reason in filename
-            if bug_enabled:
-                try:
-                    reason = _extract_crash_reason(rec, line, prev_rec, prev_line)
-                    if reason:
-                        now_t = time.time()
-                        if now_t - last_bugreport_time >= args.bugreport_cooldown:
-                            trigger_bugreport_async(reason)
-                except Exception:
-                    pass
-
-            # Custom keyword trigger
-            if bug_enabled and custom_keywords:
-                try:
-                    low = (line or "").lower()
-                    hit = next((k for k in custom_keywords if k in low), None)
-                    if hit is not None:
-                        now_t = time.time()
-                        if now_t - last_bugreport_time >= args.bugreport_cooldown:
-                            trigger_bugreport_async(f"kw_{hit}")
-                except Exception:
-                    pass
-
-            # Also keep original generic BT error trigger
-            if bug_enabled:
-                try:
-                    if should_trigger_bt_issue(rec, line):
-                        now_t = time.time()
-                        if now_t - last_bugreport_time >= args.bugreport_cooldown:
-                            trigger_bugreport_async()
-                except Exception:
-                    pass
-
-            # Update previous line tracking
-            prev_line = line
-            prev_rec = rec
+            mirror.write_lines(batch)
+            line_q.put(batch)
     except KeyboardInterrupt:
         pass
     finally:
@@ -0,0 +1,385 @@
+import csv
+import io
+import os
+import re
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import logcat_rotate  # noqa: E402
+
+RETENTION_HOURS = 36
+PREFIX = "10-15 12:00:01.123  1234  5678 "
+
+
+class ParseLogcatLineTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(logcat_rotate, "_YEAR", 2026)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _parse(self, line: str):
+        # every case runs twice: as-is, and forced through the LINE_RE fallback
+        rec = logcat_rotate.parse_logcat_line(line)
+        with mock.patch.object(logcat_rotate, "_is_threadtime_fields", return_value=False):
+            fallback = logcat_rotate.parse_logcat_line(line)
+        self.assertEqual(rec, fallback)
+        return rec
+
+    def _fields(self, line: str):
+        rec = self._parse(line)
+        self.assertIsNotNone(rec)
+        return rec.pid, rec.tid, rec.level, rec.tag, rec.message
+
+    def test_common_line_takes_fast_path(self):
+        line = PREFIX + "I BtGatt: hello world\n"
+        self.assertTrue(logcat_rotate._is_threadtime_fields(line.split(None, 6)))
+        rec = self._parse(line)
+        self.assertEqual(rec.timestamp, datetime(2026, 10, 15, 12, 0, 1, 123000))
+        self.assertEqual((rec.pid, rec.tid, rec.level, rec.tag, rec.message), ("1234", "5678", "I", "BtGatt", "hello world"))
+
+    def test_padded_tag_keeps_padding(self):
+        line = PREFIX + "I Tag  : padded\n"
+        self.assertFalse(logcat_rotate._is_threadtime_fields(line.split(None, 6)))
+        self.assertEqual(self._fields(line)[3:], ("Tag  ", "padded"))
+
+    def test_tag_with_spaces(self):
+        self.assertEqual(self._fields(PREFIX + "I My Tag: spaced\n")[3:], ("My Tag", "spaced"))
+
+    def test_tag_stops_at_first_colon(self):
+        self.assertEqual(self._fields(PREFIX + "W vendor: foo: bar\n")[3:], ("vendor", "foo: bar"))
+        # "vendor:foo:" has no whitespace after the first colon
+        self.assertIsNone(self._parse(PREFIX + "W vendor:foo: bar\n"))
+
+    def test_message_whitespace(self):
+        self.assertEqual(self._fields(PREFIX + "I Tag:  \t x  \r\n")[3:], ("Tag", "x"))
+        # nothing after "Tag:" once the line is stripped
+        self.assertIsNone(self._parse(PREFIX + "I Tag: \n"))
+
+    def test_invalid_fields(self):
+        for line in (
+            "02-30 12:00:01.123  1 2 E Tag: bad day\n",
+            "13-01 12:00:01.123  1 2 E Tag: bad month\n",
+            "10-15 24:00:01.123  1 2 E Tag: bad hour\n",
+            "10-15 12:00:01.123  1 2 X Tag: bad level\n",
+            "--------- beginning of main\n",
+        ):
+            with self.subTest(line=line):
+                self.assertIsNone(self._parse(line))
+
+    def test_leap_day_depends_on_year(self):
+        line = "02-29 12:00:01.123  1 2 I Tag: leap\n"
+        self.assertIsNone(self._parse(line))
+        with mock.patch.object(logcat_rotate, "_YEAR", 2024):
+            self.assertEqual(self._parse(line).timestamp, datetime(2024, 2, 29, 12, 0, 1, 123000))
+
+    def test_non_ascii_digits_follow_strptime(self):
+        # strptime rejects these in most positions but accepts a trailing
+        # day digit; ids are kept as matched
+        self.assertIsNone(self._parse("\u0661\u0660-\u0661\u0665 12:00:01.123  1 2 E Tag: md\n"))
+        self.assertIsNone(self._parse("10-15 12:00:01.\u0661\u0662\u0663  1 2 E Tag: ms\n"))
+        rec = self._parse("10-1\u0665 12:00:01.123  1 2 E Tag: day\n")
+        self.assertEqual(rec.timestamp, datetime(2026, 10, 15, 12, 0, 1, 123000))
+        self.assertEqual(self._fields("10-15 12:00:01.123  \u0661\u0662 2 E Tag: pid\n")[0], "\u0661\u0662")
+
+
+def _rec(ts: datetime, tag: str = "Tag", message: str = "msg") -> "logcat_rotate.LogRec":
+    return logcat_rotate.LogRec(ts, "100", "200", "I", tag, message)
+
+
+class CSVRotatorTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+
+    def _rotator(self) -> "logcat_rotate.CSVRotator":
+        return logcat_rotate.CSVRotator(self.root, "bt")
+
+    def _files(self) -> list[str]:
+        return sorted(p.relative_to(self.root).as_posix() for p in self.root.rglob("*.csv"))
+
+    def _expected(self, rows) -> bytes:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(["timestamp", "pid", "tid", "level", "tag", "message"])
+        for row in rows:
+            ts = row.timestamp.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+            writer.writerow([ts, row.pid, row.tid, row.level, row.tag, row.message])
+        return buf.getvalue().encode("utf-8")
+
+    def test_rows_match_csv_writer(self):
+        fields = ["plain", "a,b", 'say "hi"', "cr\rhere", "lf\nhere", "crlf\r\n", '",', "", " pad ", "\u85cd\u7259"]
+        ts = datetime(2026, 10, 15, 12, 0, 1, 123456)
+        rows = [_rec(ts, tag, msg) for tag in fields for msg in fields]
+        rotator = self._rotator()
+        rotator.write_rows(rows[:10])
+        for row in rows[10:]:
+            rotator.write_row(row)
+        rotator.close()
+        self.assertEqual(self._files(), ["2026-10-15_12-00/bt_2026-10-15_12-00.csv"])
+        data = (self.root / self._files()[0]).read_bytes()
+        self.assertEqual(data, self._expected(rows))
+
+    def test_minute_and_bucket_rollover(self):
+        rotator = self._rotator()
+        for ts in (
+            datetime(2026, 10, 15, 12, 4, 59, 999000),
+            datetime(2026, 10, 15, 12, 5, 0),
+            datetime(2026, 10, 15, 12, 6, 30),
+            datetime(2026, 10, 15, 23, 59, 59),
+            datetime(2026, 10, 16, 0, 0, 0),
+        ):
+            rotator.write_row(_rec(ts))
+        rotator.close()
+        self.assertEqual(
+            self._files(),
+            [
+                "2026-10-15_12-00/bt_2026-10-15_12-04.csv",
+                "2026-10-15_12-05/bt_2026-10-15_12-05.csv",
+                "2026-10-15_12-05/bt_2026-10-15_12-06.csv",
+                "2026-10-15_23-55/bt_2026-10-15_23-59.csv",
+                "2026-10-16_00-00/bt_2026-10-16_00-00.csv",
+            ],
+        )
+        data = (self.root / "2026-10-15_12-00/bt_2026-10-15_12-04.csv").read_bytes()
+        self.assertEqual(data, self._expected([_rec(datetime(2026, 10, 15, 12, 4, 59, 999000))]))
+
+    def test_header_written_once_per_file(self):
+        a = datetime(2026, 10, 15, 12, 0, 1)
+        b = datetime(2026, 10, 15, 12, 1, 1)
+        rotator = self._rotator()
+        # leave the minute and come back to it within one rotator
+        for ts in (a, b, a):
+            rotator.write_row(_rec(ts))
+        rotator.close()
+        # a new process appends to the existing file
+        rotator = self._rotator()
+        rotator.write_row(_rec(a))
+        rotator.close()
+        data = (self.root / "2026-10-15_12-00/bt_2026-10-15_12-00.csv").read_bytes()
+        self.assertEqual(data, self._expected([_rec(a)] * 3))
+
+    def test_header_rewritten_after_file_removed(self):
+        a = datetime(2026, 10, 15, 12, 0, 1)
+        b = datetime(2026, 10, 15, 12, 5, 1)
+        rotator = self._rotator()
+        rotator.write_row(_rec(a))
+        rotator.write_row(_rec(b))
+        # the cleaner may delete a file and its emptied folder at any time
+        path = self.root / "2026-10-15_12-00/bt_2026-10-15_12-00.csv"
+        path.unlink()
+        path.parent.rmdir()
+        rotator.write_row(_rec(a))
+        rotator.close()
+        self.assertEqual(path.read_bytes(), self._expected([_rec(a)]))
+
+
+class IterLogcatBatchesTest(unittest.TestCase):
+    def _read(self, data: bytes, chunk_size: int) -> list[str]:
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "adb.out")
+            with open(path, "wb") as f:
+                f.write(data)
+            fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+            try:
+                with mock.patch.object(logcat_rotate, "READ_CHUNK_SIZE", chunk_size):
+                    batches = list(logcat_rotate.iter_logcat_batches(fd))
+            finally:
+                os.close(fd)
+        for batch in batches:
+            self.assertIsInstance(batch, list)
+        return [line for batch in batches for line in batch]
+
+    def test_matches_text_mode_pipe(self):
+        cases = [
+            b"",
+            b"one\ntwo\n",
+            b"crlf one\r\ncrlf two\r\n",
+            b"lone\rcr\rlines\n",
+            b"mixed\r\n\r\nblank\rend\n",
+            b"no newline at eof",
+            b"last is cr\r",
+            "\u85cd\u7259 onNotify \u2713\n\u7b2c\u4e8c\u884c\n".encode("utf-8"),
+            b"bad \xff\xfe bytes\n",
+        ]
+        for data in cases:
+            # the reader replaced a text-mode pipe, so its lines are the reference
+            expected = list(io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="replace"))
+            for chunk_size in (1, 2, 3, 7, 1 << 16):
+                with self.subTest(data=data, chunk_size=chunk_size):
+                    self.assertEqual(self._read(data, chunk_size), expected)
+
+    def test_line_split_across_reads(self):
+        data = b"10-15 12:00:01.123  1 2 I Tag: first\n10-15 12:00:01.124  1 2 I Tag: second\n"
+        self.assertEqual(
+            self._read(data, 20),
+            ["10-15 12:00:01.123  1 2 I Tag: first\n", "10-15 12:00:01.124  1 2 I Tag: second\n"],
+        )
+
+
+CUSTOM_KEYWORDS = ["mymagicword", "token"]
+
+
+def _fired_ungated(rec, line: str, custom_re) -> tuple[bool, bool, bool, bool]:
+    # every keyword detector on every line, as before the gates existed
+    line_l = line.lower()
+    msg_l = rec.message.lower()
+    tag_l = rec.tag.strip().lower()
+    return (
+        logcat_rotate._is_gatt_service_changed_timeout(msg_l, line_l),
+        logcat_rotate._is_gatt_congestion_event(msg_l, line_l),
+        logcat_rotate.should_trigger_bt_issue(rec, tag_l, msg_l, line_l),
+        bool(custom_re.search(line_l)),
+    )
+
+
+def _fired_gated(rec, line: str, gate_re, custom_re) -> tuple[bool, bool, bool, bool]:
+    # mirrors consume_lines
+    line_l, check_sc, check_congestion, _check_crash, check_bt, check_custom = logcat_rotate.trigger_checks(
+        rec, line, gate_re, True
+    )
+    if check_sc or check_congestion or check_bt:
+        msg_l = rec.message.lower()
+        tag_l = rec.tag.strip().lower()
+    return (
+        check_sc and logcat_rotate._is_gatt_service_changed_timeout(msg_l, line_l),
+        check_congestion and logcat_rotate._is_gatt_congestion_event(msg_l, line_l),
+        check_bt and logcat_rotate.should_trigger_bt_issue(rec, tag_l, msg_l, line_l),
+        check_custom and bool(custom_re.search(line_l)),
+    )
+
+
+class TriggerGateTest(unittest.TestCase):
+    MESSAGES = [
+        "totally benign",
+        "GATT_INDICATION_CONFIRMATION_TIMEOUT",
+        "Service Changed Notification Timed Out",
+        "gatt_utils.cc:12 service changed timed out",
+        "service changed",
+        "gatt timeout here",
+        "gatt timeout anr",
+        "gatt timeout crash",
+        "bta_gattc_cmpl_cback status=0x8E",
+        "bta_gattc_cmpl_cback status: 142",
+        "BTA_GATTC_CMPL_CBACK GATT_BUSY",
+        "bta_gattc_cmpl_cback gatt_congested",
+        "bta_gattc_cmpl_cback status=0",
+        "bta_gattc_cmpl_cbac\u212a status=142",
+        "bluetooth crash",
+        "Bluetooth FATAL error",
+        "assert failed",
+        "ANR in com.example",
+        "FATAL EXCEPTION: main",
+        "Fatal signal 11 (SIGSEGV) pid 1 (com.native.app)",
+        "MyMagicWord appears",
+        "other,Token; here",
+        "time",
+    ]
+    TAGS = ["Foo", "BtGatt", "BtGatt.GattService", "bt_stack", "BluetoothAdapter", "AndroidRuntime", "libc", "Bt Gatt "]
+
+    def _lines(self):
+        for level in "VDIWEF":
+            for tag in self.TAGS:
+                for msg in self.MESSAGES:
+                    yield f"10-15 12:00:01.000  100  200 {level} {tag}: {msg}\n"
+        yield "bluetooth fatal error not logcat format\n"
+        yield "bt assert in raw output\n"
+        yield "--------- beginning of main\n"
+
+    def test_gated_detectors_fire_on_same_lines(self):
+        gate_re = logcat_rotate.build_trigger_gate_re(CUSTOM_KEYWORDS)
+        custom_re = re.compile("|".join(re.escape(k) for k in CUSTOM_KEYWORDS))
+        fired = [0, 0, 0, 0]
+        for line in self._lines():
+            rec = logcat_rotate.parse_logcat_line(line)
+            if rec is None:
+                # same fallback record as consume_lines
+                rec = logcat_rotate.LogRec(datetime.now(), "", "", "", "", line.strip())
+            expected = _fired_ungated(rec, line, custom_re)
+            with self.subTest(line=line):
+                self.assertEqual(_fired_gated(rec, line, gate_re, custom_re), expected)
+            fired = [n + hit for n, hit in zip(fired, expected)]
+        # every detector is exercised by the table
+        self.assertTrue(all(fired), fired)
+
+    def test_crash_check_follows_tag(self):
+        gate_re = logcat_rotate.build_trigger_gate_re([])
+        for tag, expected in (("AndroidRuntime", True), ("libc", True), ("AndroidRuntimeX", False), ("Foo", False)):
+            rec = logcat_rotate.LogRec(datetime(2026, 10, 15), "1", "2", "I", tag, "nothing")
+            with self.subTest(tag=tag):
+                self.assertEqual(logcat_rotate.trigger_checks(rec, f"I {tag}: nothing", gate_re, False)[3], expected)
+
+
+class CleanupOldLogsTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name) / "logs"
+        self.root.mkdir()
+        # keep the top-level folder non-empty so its own rmdir never interferes
+        (self.root / "README").write_text("x")
+        self.now = time.time()
+        self.old = self.now - (RETENTION_HOURS + 4) * 3600
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _bucket(self, epoch: float, files: dict[str, float], dir_mtime: float) -> Path:
+        name = datetime.fromtimestamp(epoch).replace(second=0).strftime("%Y-%m-%d_%H-%M")
+        bucket = self.root / name
+        bucket.mkdir()
+        for fname, mtime in files.items():
+            f = bucket / fname
+            f.write_text("timestamp,pid,tid,level,tag,message\r\n")
+            os.utime(f, (mtime, mtime))
+        os.utime(bucket, (dir_mtime, dir_mtime))
+        return bucket
+
+    def _cleanup(self):
+        logcat_rotate.cleanup_old_logs(self.root, RETENTION_HOURS, "bt")
+
+    def test_expired_bucket_is_removed(self):
+        bucket = self._bucket(self.old, {"bt_a.csv": self.old, "bugreport-x.zip": self.old}, self.old)
+        self._cleanup()
+        self.assertFalse(bucket.exists())
+
+    def test_expired_bucket_keeps_foreign_files(self):
+        bucket = self._bucket(self.old, {"bt_a.csv": self.old, "keep.log": self.old}, self.old)
+        self._cleanup()
+        self.assertEqual(sorted(os.listdir(bucket)), ["keep.log"])
+
+    def test_recent_bucket_is_skipped(self):
+        # judged by name only: stale file mtimes inside do not matter
+        bucket = self._bucket(self.now - 3600, {"bt_a.csv": self.old}, self.old)
+        self._cleanup()
+        self.assertEqual(os.listdir(bucket), ["bt_a.csv"])
+
+    def test_lagging_clock_bucket_keeps_fresh_files(self):
+        # name says expired, but the folder was written recently
+        bucket = self._bucket(self.old, {"bt_a.csv": self.now, "bt_b.csv": self.old}, self.now)
+        self._cleanup()
+        self.assertEqual(os.listdir(bucket), ["bt_a.csv"])
+
+    def test_ahead_clock_bucket_falls_back_to_mtime(self):
+        bucket = self._bucket(self.now + 2 * 3600, {"bt_a.csv": self.now, "bt_b.csv": self.old}, self.now)
+        self._cleanup()
+        self.assertEqual(os.listdir(bucket), ["bt_a.csv"])
+
+    def test_unrelated_folder_is_cleaned_per_file(self):
+        other = self.root / "bugreports"
+        other.mkdir()
+        for fname, mtime in {"bugreport-old.zip": self.old, "bugreport-new.zip": self.now}.items():
+            (other / fname).write_text("x")
+            os.utime(other / fname, (mtime, mtime))
+        self._cleanup()
+        self.assertEqual(os.listdir(other), ["bugreport-new.zip"])
+
+
+if __name__ == "__main__":
+    unittest.main()